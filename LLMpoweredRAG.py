@@ -3,233 +3,570 @@
 # ============================================================================
 
 import os
+import re
+import sys
 import json
+import time
+import heapq
+import operator
+import atexit
+import asyncio
+import threading
+from collections import OrderedDict
+from itertools import islice
 from typing import Dict, List, Any
-from langchain_anthropic import ChatAnthropic
-from langchain_core.messages import HumanMessage
-from langgraph.graph import StateGraph, END
-from typing import TypedDict
+from dataclasses import dataclass
+import numpy as np
+import httpx
+import anthropic
+from prompt_toolkit import PromptSession
+from langgraph.graph import StateGraph, START, END
+
+# Static synthesis instructions - kept byte-identical across calls so the
+# Anthropic prompt cache can reuse the prefix (cache is prefix-hash keyed).
+# All of the stable analysis and output-format scaffolding lives here, on
+# purpose: claude-3-5-sonnet only caches prefixes of 1024+ tokens, so the
+# block must stay comfortably above that for the cache to form at all.
+SYNTH_INSTRUCTIONS = """You are an expert research assistant at the University of Birmingham. You help students, academics and external partners understand the university's research landscape: who works on what, how strong the activity in an area is, how it is trending, and who would make a good collaborator or supervisor. Analyze the research query together with the retrieval data you are given and provide comprehensive, practical guidance.
+
+THE DATA YOU RECEIVE
+
+Each request contains the user's research question followed by four JSON payloads produced by the university's knowledge-graph pipeline:
+
+- PAPERS FOUND: the most relevant Birmingham publications for the query, ranked by semantic similarity. Each entry carries the title (possibly truncated), up to three authors, publication year, citation count, the lead institution and a relevance score between 0 and 1.
+- RESEARCHERS IDENTIFIED: Birmingham researchers ranked by a composite score that blends productivity (paper count), impact (citations), recent activity and topical diversity. Each entry lists paper and citation totals, recent-work counts, the researcher's department and a representative paper title.
+- COLLABORATION NETWORKS: a summary of the co-authorship graph for this topic - the number of researchers and collaboration edges, the number of detected research communities, and the researchers with the highest degree centrality (the best-connected people in the field at Birmingham).
+- RESEARCH TRENDS: publication and citation activity by year, an overall growing/stable trend signal, and the emerging keywords whose usage is accelerating in recent titles.
+
+Any of the four payloads may be an error string or contain few or no entries. Treat that as missing evidence, not as evidence of absence: say plainly that the retrieval found little on the topic and reason from what remains, rather than inventing papers, names or numbers that are not in the data.
+
+HOW TO ANALYZE
+
+1. Read the query carefully and identify what the user actually needs: a literature entry point, a supervisor or collaborator, a feasibility judgement for a project idea, or a picture of how active the field is. Address that need first.
+2. Cross-reference the payloads. A researcher who appears among the top papers, the ranked researchers and the central network nodes is a far stronger recommendation than one who appears only once; say so explicitly when it happens.
+3. Weigh recency against raw volume. High citation counts on older papers indicate an established group; several recent papers with modest citations indicate an active, rising one. Use the yearly trend data to tell these apart.
+4. Use the collaboration structure. Multiple communities suggest distinct groups or sub-fields working on the topic; name the central researchers as natural entry points into each.
+5. Use the emerging keywords to connect the user's idea to where the field is moving, and flag when the user's framing sits outside the current activity.
+6. Be honest about limits. The data covers Birmingham-affiliated output indexed in Scopus; it is not a global literature review, and absence from these payloads does not mean no one at Birmingham works on the subject.
+
+HOW TO STRUCTURE THE RESPONSE
+
+Produce a well-organised answer with these sections, using clear markdown headings:
+
+## Direct Answer
+Two or three sentences that answer the research question head-on before any supporting detail.
+
+## Birmingham's Strengths in This Area
+What the paper, network and trend data say about the university's footprint on the topic: volume, impact, momentum and distinctive angles. Quote concrete numbers from the payloads (papers found, citation totals, growth direction) rather than vague qualifiers.
+
+## Key Researchers and Their Expertise
+The three to six most relevant people, each with a one-line justification grounded in the data: their papers, citations, recency, centrality in the collaboration network, and what their representative work suggests they focus on. Prefer people supported by multiple payloads.
+
+## Recommended Next Steps
+Three to five numbered, concrete actions the user can take this week: papers to read first, people to email and why, datasets or methods to look into, seminars or groups to approach. Make each step specific enough to act on without further research.
+
+## Collaboration Opportunities
+Which researchers or communities to approach for partnership, what complementary expertise they bring, and - when the network data shows separate communities - where a bridge between groups would be valuable.
+
+EDGE CASES
+
+- If the query is not about research at all (scheduling, admissions, IT support), say that this assistant covers Birmingham's research landscape and suggest rephrasing toward a research topic.
+- If the query names a specific person, centre the answer on that person's data when present, and say clearly when they do not appear in the payloads.
+- If the query spans several distinct topics, pick the dominant one for the structured sections and note which parts of the data belong to which topic.
+- If two payloads disagree (for example strong papers but an empty collaboration network), point out the discrepancy instead of smoothing over it.
+
+STYLE AND QUALITY BAR
+
+- Be practical and actionable; every section should help the user decide what to do next, not merely describe the data.
+- Ground every named researcher, paper and statistic in the supplied payloads. Never fabricate citations, counts or names.
+- Use plain, confident prose. Avoid filler phrases, hedging boilerplate and restating the question at length.
+- Keep the response proportionate to the question: a narrow factual query deserves a shorter answer that still follows the section structure; a broad strategy question can use the full budget.
+- If the retrieval data is too thin to support a section, keep the heading, say in one sentence that the data is insufficient, and suggest how the user could refine the query.
+- Write for a reader who may be new to the university: expand acronyms on first use and briefly explain internal structures (schools, colleges, institutes) when they matter.
+
+When your answer is complete, finish with the line ---END--- and nothing after it."""
+
+# Prebuilt once: the system block list is identical on every call, and the
+# user message only needs a .format() fill instead of rebuilding the
+# scaffold string per query
+SYNTH_SYSTEM = [{
+    "type": "text",
+    "text": SYNTH_INSTRUCTIONS,
+    "cache_control": {"type": "ephemeral"}
+}]
+
+SYNTH_USER_TEMPLATE = """Query: "{query}"
+
+Research Data:
+
+PAPERS FOUND:
+{papers}
+
+RESEARCHERS IDENTIFIED:
+{researchers}
+
+COLLABORATION NETWORKS:
+{networks}
+
+RESEARCH TRENDS:
+{trends}"""
 
 # ============================================================================
 # STATE AND WORKFLOW
 # ============================================================================
 
-class ResearchState(TypedDict):
-    query: str
-    papers: str
-    researchers: str  
-    networks: str
-    trends: str
-    response: str
+@dataclass(slots=True)
+class ResearchState:
+    query: str = ""
+    query_embedding: Any = None
+    search_results: Any = None
+    papers: str = ""
+    researchers: str = ""
+    networks: str = ""
+    trends: str = ""
+    response: str = ""
 
-class SmartResearchAssistant:
-    def __init__(self, rag_system, research_assistant, collab_analyzer):
-        """Initialize with your existing components"""
-        self.rag = rag_system
-        self.research_assistant = research_assistant
-        self.collab_analyzer = collab_analyzer
+# Field extraction for the papers summary - one precompiled itemgetter
+# call per paper instead of six dict.get dispatches
+_PAPER_DEFAULTS = {'title': '', 'authors': [], 'year': 'N/A', 'citations': 0,
+                   'main_affiliation': '', 'similarity_score': 0}
+_get_paper_fields = operator.itemgetter('title', 'authors', 'year', 'citations',
+                                        'main_affiliation', 'similarity_score')
+
+def normalize_query(query):
+    """Normalize a query for cache keying: lowercase, strip punctuation,
+    collapse whitespace - catches trivial rephrasings"""
+    return re.sub(r'\s+', ' ', re.sub(r'[^\w\s]', '', query.lower())).strip()
+
+class TTLCache:
+    """Small thread-safe LRU cache with per-entry expiry"""
+
+    def __init__(self, maxsize=256, ttl=600):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()   # key -> (timestamp, value)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            timestamp, value = entry
+            if time.time() - timestamp > self.ttl:
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.time(), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+class SemanticCache:
+    """Cosine-similarity cache over query embeddings.
+
+    Interactive users re-ask near-duplicate questions ("find ML healthcare
+    researchers" vs "researchers working on ML in healthcare") - when a new
+    query embeds close enough to a cached one, reuse its response and skip
+    the four retrieval calls plus the Claude synthesis entirely.
+    """
+
+    def __init__(self, embedding_model, threshold=0.95, ttl=600, maxsize=512):
+        self.embedding_model = embedding_model
+        self.threshold = threshold
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.embeddings = None   # (n, dim) float32 matrix, L2-normalized rows
+        self.entries = []        # parallel list of (response, timestamp)
+
+    def embed(self, query):
+        """Embed a query as a normalized float32 vector"""
+        vec = self.embedding_model.encode([query], normalize_embeddings=True)[0]
+        return vec.astype(np.float32)
+
+    def lookup(self, query_vec):
+        """Return the cached response for the closest query, or None"""
+        if self.embeddings is None:
+            return None
+
+        sims = self.embeddings @ query_vec
+        best = int(np.argmax(sims))
+        response, timestamp = self.entries[best]
+
+        if sims[best] >= self.threshold and time.time() - timestamp <= self.ttl:
+            return response
+        return None
+
+    def store(self, query_vec, response):
+        """Add a query embedding and its response to the cache"""
+        row = query_vec.reshape(1, -1)
+        if self.embeddings is None:
+            self.embeddings = row
+        else:
+            if len(self.entries) >= self.maxsize:
+                # Drop the oldest entry to keep the matrix bounded
+                self.embeddings = self.embeddings[1:]
+                self.entries.pop(0)
+            self.embeddings = np.vstack([self.embeddings, row])
+        self.entries.append((response, time.time()))
+
+async def _retrieve(state: ResearchState, config) -> Dict[str, Any]:
+    """Run the semantic search once for the whole workflow - the four
+    analysis nodes each used to issue their own search over the same
+    query, so the shared pass replaces four vector searches (and their
+    per-document author lookups) with one"""
+    assistant = config["configurable"]["assistant"]
+    query = state.query
+    cache_key = ("results", normalize_query(query))
+    cached = assistant.node_cache.get(cache_key)
+    if cached is not None:
+        return {"search_results": cached}
+    try:
+        results = await asyncio.to_thread(assistant.rag.semantic_search_with_authors, query, 100,
+                                          precomputed_embedding=state.query_embedding)
+    except Exception as e:
+        # Degrade like the analysis nodes do: an empty result set lets
+        # them report "no data" and synthesis still runs, instead of the
+        # failure aborting the whole workflow
+        print(f"Retrieval error: {e}")
+        return {"search_results": []}
+    assistant.node_cache.set(cache_key, results)
+    return {"search_results": results}
+
+async def _search_papers(state: ResearchState, config) -> Dict[str, Any]:
+    """Search for relevant papers"""
+    assistant = config["configurable"]["assistant"]
+    query = state.query
+    cache_key = ("papers", normalize_query(query))
+    cached = assistant.node_cache.get(cache_key)
+    if cached is not None:
+        return {"papers": cached}
+    try:
+        results = list(islice(state.search_results, 8))
+
+        papers = []
+        # islice keeps this zero-copy - no head-of-list allocations
+        for i, paper in enumerate(islice(results, 5), 1):
+            title, authors, year, citations, institution, relevance = \
+                _get_paper_fields({**_PAPER_DEFAULTS, **paper})
+            papers.append({
+                'rank': i,
+                'title': (title or '')[:100],
+                'authors': list(islice(authors or (), 3)),
+                'year': year,
+                'citations': citations,
+                'institution': institution,
+                'relevance': round(relevance or 0, 3)
+            })
         
-        # Initialize Claude
-        self.llm = ChatAnthropic(
-            model="claude-3-5-sonnet-20241022",
-            anthropic_api_key=os.environ.get('ANTHROPIC_API_KEY'),
-            temperature=0.1,
-            max_tokens=4000
-        )
+        payload = json.dumps({'found': len(results), 'papers': papers}, separators=(",", ":"), ensure_ascii=False)
+        assistant.node_cache.set(cache_key, payload)
+        return {"papers": payload}
+    except Exception as e:
+        return {"papers": f"Error: {str(e)}"}
+
+async def _find_researchers(state: ResearchState, config) -> Dict[str, Any]:
+    """Find Birmingham researchers"""
+    assistant = config["configurable"]["assistant"]
+    query = state.query
+    cache_key = ("researchers", normalize_query(query))
+    cached = assistant.node_cache.get(cache_key)
+    if cached is not None:
+        return {"researchers": cached}
+    try:
+        researchers = await asyncio.to_thread(assistant.research_assistant.find_birmingham_researchers, query, 6,
+                                              papers=state.search_results[:50])
         
-        # Build workflow
-        self.workflow = self._build_workflow()
-        self.app = self.workflow.compile()
+        researcher_list = []
+        for score, name, metrics in islice(researchers, 5):
+            researcher_list.append({
+                'name': name,
+                'score': round(score, 2),
+                'papers': metrics['paper_count'],
+                'citations': metrics['total_citations'],
+                'recent_work': metrics['recent_papers'],
+                'department': metrics['main_affiliation'],
+                'expertise': metrics['papers'][0]['title'][:80] if metrics['papers'] else 'N/A'
+            })
         
-    def _build_workflow(self):
-        workflow = StateGraph(ResearchState)
+        payload = json.dumps({'found': len(researchers), 'researchers': researcher_list}, separators=(",", ":"), ensure_ascii=False)
+        assistant.node_cache.set(cache_key, payload)
+        return {"researchers": payload}
+    except Exception as e:
+        return {"researchers": f"Error: {str(e)}"}
+
+async def _analyze_networks(state: ResearchState, config) -> Dict[str, Any]:
+    """Analyze collaboration networks"""
+    assistant = config["configurable"]["assistant"]
+    query = state.query
+    cache_key = ("networks", normalize_query(query))
+    cached = assistant.node_cache.get(cache_key)
+    if cached is not None:
+        return {"networks": cached}
+    try:
+        network_data = await asyncio.to_thread(assistant.collab_analyzer.analyze_collaboration_network, query, min_papers=2,
+                                               papers=state.search_results[:50])
         
-        workflow.add_node("search_papers", self._search_papers)
-        workflow.add_node("find_researchers", self._find_researchers)
-        workflow.add_node("analyze_networks", self._analyze_networks)
-        workflow.add_node("analyze_trends", self._analyze_trends)
-        workflow.add_node("synthesize", self._synthesize)
+        centrality = network_data['centrality_metrics']
+        communities = network_data['communities']
+
+        key_researchers = []
+        if centrality.get('degree'):
+            # O(n log 4) top-k instead of sorting the whole centrality dict
+            for name, score in heapq.nlargest(4, centrality['degree'].items(), key=operator.itemgetter(1)):
+                key_researchers.append({'name': name, 'centrality': round(score, 3)})
         
-        workflow.set_entry_point("search_papers")
-        workflow.add_edge("search_papers", "find_researchers")
-        workflow.add_edge("find_researchers", "analyze_networks") 
-        workflow.add_edge("analyze_networks", "analyze_trends")
-        workflow.add_edge("analyze_trends", "synthesize")
-        workflow.add_edge("synthesize", END)
+        network_summary = {
+            'researchers': network_data['n_nodes'],
+            'collaborations': network_data['n_edges'],
+            'communities': len(communities),
+            'key_researchers': key_researchers
+        }
         
-        return workflow
-    
-    def _search_papers(self, state: ResearchState) -> ResearchState:
-        """Search for relevant papers"""
-        query = state["query"]
-        try:
-            results = self.rag.semantic_search_with_authors(query, 8)
-            
-            papers = []
-            for i, paper in enumerate(results[:5], 1):
-                papers.append({
-                    'rank': i,
-                    'title': paper.get('title', '')[:100],
-                    'authors': paper.get('authors', [])[:3],
-                    'year': paper.get('year', 'N/A'),
-                    'citations': paper.get('citations', 0),
-                    'institution': paper.get('main_affiliation', ''),
-                    'relevance': round(paper.get('similarity_score', 0), 3)
-                })
-            
-            state["papers"] = json.dumps({'found': len(results), 'papers': papers}, indent=2)
-        except Exception as e:
-            state["papers"] = f"Error: {str(e)}"
+        payload = json.dumps(network_summary, separators=(",", ":"), ensure_ascii=False)
+        assistant.node_cache.set(cache_key, payload)
+        return {"networks": payload}
+    except Exception as e:
+        return {"networks": f"Error: {str(e)}"}
+
+async def _analyze_trends(state: ResearchState, config) -> Dict[str, Any]:
+    """Analyze research trends"""
+    assistant = config["configurable"]["assistant"]
+    query = state.query
+    cache_key = ("trends", normalize_query(query))
+    cached = assistant.node_cache.get(cache_key)
+    if cached is not None:
+        return {"trends": cached}
+    try:
+        trends_data = await asyncio.to_thread(assistant.collab_analyzer.analyze_research_trends, query, years_back=8,
+                                              papers=state.search_results)
         
-        return state
-    
-    def _find_researchers(self, state: ResearchState) -> ResearchState:
-        """Find Birmingham researchers"""
-        query = state["query"]
-        try:
-            researchers = self.research_assistant.find_birmingham_researchers(query, 6)
-            
-            researcher_list = []
-            for score, name, metrics in researchers[:5]:
-                researcher_list.append({
-                    'name': name,
-                    'score': round(score, 2),
-                    'papers': metrics['paper_count'],
-                    'citations': metrics['total_citations'],
-                    'recent_work': metrics['recent_papers'],
-                    'department': metrics['main_affiliation'],
-                    'expertise': metrics['papers'][0]['title'][:80] if metrics['papers'] else 'N/A'
+        trend_analysis = trends_data['trend_analysis']
+        emerging_keywords = trends_data['emerging_keywords']
+        yearly_data = trends_data['yearly_data']
+        
+        recent_years = heapq.nlargest(4, yearly_data.keys())
+        recent_activity = []
+        for year in recent_years:
+            if year in yearly_data:
+                data = yearly_data[year]
+                recent_activity.append({
+                    'year': year,
+                    'papers': data['papers'],
+                    'citations': data['citations']
                 })
-            
-            state["researchers"] = json.dumps({'found': len(researchers), 'researchers': researcher_list}, indent=2)
-        except Exception as e:
-            state["researchers"] = f"Error: {str(e)}"
         
-        return state
-    
-    def _analyze_networks(self, state: ResearchState) -> ResearchState:
-        """Analyze collaboration networks"""
-        query = state["query"]
-        try:
-            network_data = self.collab_analyzer.analyze_collaboration_network(query, min_papers=2)
-            
-            G = network_data['graph']
-            centrality = network_data['centrality_metrics']
-            communities = network_data['communities']
-            
-            key_researchers = []
-            if centrality.get('degree'):
-                for name, score in sorted(centrality['degree'].items(), key=lambda x: x[1], reverse=True)[:4]:
-                    key_researchers.append({'name': name, 'centrality': round(score, 3)})
-            
-            network_summary = {
-                'researchers': len(G.nodes),
-                'collaborations': len(G.edges),
-                'communities': len(communities),
-                'key_researchers': key_researchers
-            }
-            
-            state["networks"] = json.dumps(network_summary, indent=2)
-        except Exception as e:
-            state["networks"] = f"Error: {str(e)}"
+        trends_summary = {
+            'total_papers': trend_analysis.get('total_papers', 0),
+            'total_citations': trend_analysis.get('total_citations', 0),
+            'trend': 'growing' if trend_analysis.get('paper_trend', 0) > 0.1 else 'stable',
+            'recent_years': recent_activity,
+            'emerging_topics': [kw for kw, _, _ in islice(emerging_keywords, 5)]
+        }
         
-        return state
-    
-    def _analyze_trends(self, state: ResearchState) -> ResearchState:
-        """Analyze research trends"""
-        query = state["query"]
+        payload = json.dumps(trends_summary, separators=(",", ":"), ensure_ascii=False)
+        assistant.node_cache.set(cache_key, payload)
+        return {"trends": payload}
+    except Exception as e:
+        return {"trends": f"Error: {str(e)}"}
+
+async def _synthesize(state: ResearchState, config) -> Dict[str, Any]:
+    """Synthesize comprehensive response using Claude"""
+    assistant = config["configurable"]["assistant"]
+
+    # Only the query + retrieval payloads change per call; the static
+    # instructions live in a cached system block (~10% input cost and
+    # much lower TTFT on repeat calls within the cache TTL)
+    dynamic_part = SYNTH_USER_TEMPLATE.format(
+        query=state.query,
+        papers=state.papers,
+        researchers=state.researchers,
+        networks=state.networks,
+        trends=state.trends
+    )
+
+    # Short questions rarely need the full 4K-token budget; generation
+    # time scales with output length, so cap it adaptively and let the
+    # stop sequence end generation as soon as the answer is done
+    max_tokens = 1500 if len(state.query.split()) < 8 else 4000
+
+    try:
+        # Stream tokens so the caller sees the answer as it generates
+        # instead of waiting for the full completion
+        chunks = []
+        async with assistant.client.messages.stream(
+            model=assistant.model,
+            max_tokens=max_tokens,
+            temperature=0.1,
+            stop_sequences=["\n---END---"],
+            system=SYNTH_SYSTEM,
+            messages=[{"role": "user", "content": dynamic_part}],
+            extra_headers={"anthropic-beta": "prompt-caching-2024-07-31"}
+        ) as stream:
+            # Buffer the stream writes - flushing on every token event
+            # burns CPU on a 4K-token response for no visible benefit
+            buffered = 0
+            async for text in stream.text_stream:
+                sys.stdout.write(text)
+                chunks.append(text)
+                buffered += len(text)
+                if buffered >= 512:
+                    sys.stdout.flush()
+                    buffered = 0
+            sys.stdout.write("\n")
+            sys.stdout.flush()
+
+            usage = (await stream.get_final_message()).usage
+            cache_read = getattr(usage, 'cache_read_input_tokens', 0) or 0
+            cache_created = getattr(usage, 'cache_creation_input_tokens', 0) or 0
+            if cache_read or cache_created:
+                print(f"Prompt cache: {cache_read} tokens read, {cache_created} tokens created")
+
+        return {"response": "".join(chunks)}
+    except Exception as e:
+        return {"response": f"Error in synthesis: {str(e)}"}
+
+def _build_workflow():
+    """Assemble the research workflow graph"""
+    workflow = StateGraph(ResearchState)
+
+    workflow.add_node("retrieve", _retrieve)
+    workflow.add_node("search_papers", _search_papers)
+    workflow.add_node("find_researchers", _find_researchers)
+    workflow.add_node("analyze_networks", _analyze_networks)
+    workflow.add_node("analyze_trends", _analyze_trends)
+    workflow.add_node("synthesize", _synthesize)
+
+    # One shared retrieval pass feeds the four analysis nodes, which fan
+    # out in parallel and join at synthesize - wall time becomes the
+    # retrieval plus the max of the four instead of their sum
+    workflow.add_edge(START, "retrieve")
+    workflow.add_edge("retrieve", "search_papers")
+    workflow.add_edge("retrieve", "find_researchers")
+    workflow.add_edge("retrieve", "analyze_networks")
+    workflow.add_edge("retrieve", "analyze_trends")
+    workflow.add_edge("search_papers", "synthesize")
+    workflow.add_edge("find_researchers", "synthesize")
+    workflow.add_edge("analyze_networks", "synthesize")
+    workflow.add_edge("analyze_trends", "synthesize")
+    workflow.add_edge("synthesize", END)
+
+    return workflow
+
+# Compiled once at import time - the nodes are stateless and pull the
+# assistant out of the run config, so every SmartResearchAssistant
+# instance shares the same compiled graph instead of rebuilding it
+WORKFLOW_APP = _build_workflow().compile()
+
+class SmartResearchAssistant:
+    def __init__(self, rag_system, research_assistant, collab_analyzer):
+        """Initialize with your existing components"""
+        self.rag = rag_system
+        self.research_assistant = research_assistant
+        self.collab_analyzer = collab_analyzer
+
+        # Initialize Claude - one async client reused for every synthesis
+        # call so the workflow's event loop never blocks on generation.
+        # The shared HTTP/2 transport keeps the TCP+TLS session alive
+        # across calls, so the prewarm ping and the real synthesis (and
+        # consecutive REPL questions) skip the handshake and multiplex
+        # on one connection
+        self.model = "claude-3-5-sonnet-20241022"
+        self._http = httpx.AsyncClient(
+            http2=True,
+            timeout=60.0,
+            limits=httpx.Limits(max_keepalive_connections=10, keepalive_expiry=300)
+        )
+        self.client = anthropic.AsyncAnthropic(
+            api_key=os.environ.get('ANTHROPIC_API_KEY'),
+            http_client=self._http
+        )
+        atexit.register(self.close)
+
+        # Semantic cache reuses the RAG system's embedding model so we
+        # don't load a second SentenceTransformer
+        self.semantic_cache = SemanticCache(rag_system.embedding_model)
+
+        # Per-node retrieval cache so re-queries of the same topic skip
+        # the vector search / graph analysis entirely
+        self.node_cache = TTLCache(maxsize=256, ttl=600)
+
+        # Holds the in-flight prompt-cache prewarm task so it isn't
+        # garbage-collected before it completes
+        self._prewarm_task = None
+
+    def close(self):
+        """Close the shared HTTP client"""
+        if self._http.is_closed:
+            return
         try:
-            trends_data = self.collab_analyzer.analyze_research_trends(query, years_back=8)
-            
-            trend_analysis = trends_data['trend_analysis']
-            emerging_keywords = trends_data['emerging_keywords']
-            yearly_data = trends_data['yearly_data']
-            
-            recent_years = sorted(yearly_data.keys(), reverse=True)[:4]
-            recent_activity = []
-            for year in recent_years:
-                if year in yearly_data:
-                    data = yearly_data[year]
-                    recent_activity.append({
-                        'year': year,
-                        'papers': data['papers'],
-                        'citations': data['citations']
-                    })
-            
-            trends_summary = {
-                'total_papers': trend_analysis.get('total_papers', 0),
-                'total_citations': trend_analysis.get('total_citations', 0),
-                'trend': 'growing' if trend_analysis.get('paper_trend', 0) > 0.1 else 'stable',
-                'recent_years': recent_activity,
-                'emerging_topics': [kw for kw, _, _ in emerging_keywords[:5]]
-            }
-            
-            state["trends"] = json.dumps(trends_summary, indent=2)
-        except Exception as e:
-            state["trends"] = f"Error: {str(e)}"
-        
-        return state
-    
-    def _synthesize(self, state: ResearchState) -> ResearchState:
-        """Synthesize comprehensive response using Claude"""
-        
-        prompt = f"""
-        You are an expert research assistant at University of Birmingham. Analyze this research query and provide comprehensive guidance.
-        
-        Query: "{state['query']}"
-        
-        Research Data:
-        
-        PAPERS FOUND:
-        {state['papers']}
-        
-        RESEARCHERS IDENTIFIED:
-        {state['researchers']}
-        
-        COLLABORATION NETWORKS:
-        {state['networks']}
-        
-        RESEARCH TRENDS:
-        {state['trends']}
-        
-        Provide a comprehensive response that:
-        1. Directly answers the research question
-        2. Highlights Birmingham's strengths in this area
-        3. Identifies key researchers and their expertise
-        4. Provides actionable next steps and recommendations
-        5. Suggests collaboration opportunities
-        
-        Structure with clear headings and be practical and actionable.
-        """
-        
+            asyncio.run(self._http.aclose())
+        except RuntimeError:
+            pass
+
+    async def _refresh_prompt_cache(self):
+        """Cheap 1-token ping reusing the cached system block so the
+        ~5-minute prompt-cache TTL stays warm between questions"""
         try:
-            response = self.llm.invoke([HumanMessage(content=prompt)])
-            state["response"] = response.content
-        except Exception as e:
-            state["response"] = f"Error in synthesis: {str(e)}"
-        
-        return state
-    
-    def query(self, research_query: str) -> str:
-        """Process research query through complete workflow"""
-        
+            await self.client.messages.create(
+                model=self.model,
+                max_tokens=1,
+                system=SYNTH_SYSTEM,
+                messages=[{"role": "user", "content": "ping"}],
+                extra_headers={"anthropic-beta": "prompt-caching-2024-07-31"}
+            )
+        except Exception:
+            pass
+
+    async def aquery(self, research_query: str) -> str:
+        """Process research query through complete workflow (async)"""
+
         print(f"Processing: {research_query}")
         print("=" * 60)
-        
-        initial_state = {
-            "query": research_query,
-            "papers": "",
-            "researchers": "",
-            "networks": "",
-            "trends": "",
-            "response": ""
-        }
-        
+
+        # Check the semantic cache before running the full pipeline
+        query_vec = await asyncio.to_thread(self.semantic_cache.embed, research_query)
+        cached_response = self.semantic_cache.lookup(query_vec)
+        if cached_response is not None:
+            print("Semantic cache hit - reusing previous analysis")
+            print(cached_response)
+            return cached_response
+
+        # Speculatively warm the prompt cache while retrieval runs: the
+        # 1-token ping makes Anthropic prefill the static system block,
+        # so the real synthesis call starts from a hot KV cache (keep a
+        # reference so the task isn't garbage-collected mid-flight)
+        self._prewarm_task = asyncio.create_task(self._refresh_prompt_cache())
+
+        # Reuse the semantic-cache embedding so the four retrieval
+        # nodes don't each re-encode the same query
+        initial_state = ResearchState(query=research_query, query_embedding=query_vec)
+
         try:
-            final_state = self.app.invoke(initial_state)
-            return final_state["response"]
+            final_state = await WORKFLOW_APP.ainvoke(
+                initial_state, config={"configurable": {"assistant": self}})
+            response = final_state["response"]
+            # Never cache a failed synthesis - a transient API error would
+            # otherwise be replayed for every near-duplicate question
+            if not response.startswith("Error in synthesis:"):
+                self.semantic_cache.store(query_vec, response)
+            return response
         except Exception as e:
             return f"Workflow error: {str(e)}"
+        finally:
+            # Let an in-flight prewarm ping finish - in the one-shot
+            # query() path asyncio.run tears the loop down right after
+            # this coroutine returns, which would cancel it mid-request
+            if self._prewarm_task is not None and not self._prewarm_task.done():
+                await self._prewarm_task
+
+    def query(self, research_query: str) -> str:
+        """Process research query through complete workflow"""
+        return asyncio.run(self.aquery(research_query))
 
 # ============================================================================
 # INITIALIZE AND USE
@@ -250,8 +587,17 @@ def create_smart_assistant():
         print(f"❌ Error: {e}")
         return None
 
-# Create the assistant
-smart_assistant = create_smart_assistant()
+# Lazily-created singleton - importing this module no longer builds the
+# LangChain stack or requires ANTHROPIC_API_KEY; the assistant is
+# constructed on first real use
+_assistant = None
+
+def get_assistant():
+    """Return the process-wide assistant, creating it on first use"""
+    global _assistant
+    if _assistant is None:
+        _assistant = create_smart_assistant()
+    return _assistant
 
 # ============================================================================
 # INTERACTIVE FUNCTIONS
@@ -259,11 +605,19 @@ smart_assistant = create_smart_assistant()
 
 def interactive_research_assistant():
     """Interactive function for user queries"""
-    
+    asyncio.run(_interactive_research_assistant())
+
+async def _interactive_research_assistant():
+    """Async REPL - the process keeps the prompt cache warm in the
+    background while the user types the next question"""
+
+    smart_assistant = get_assistant()
     if not smart_assistant:
         print("❌ Assistant not initialized. Check your API key and components.")
         return
-    
+
+    session = PromptSession()
+
     print("\n🔬 Birmingham Research Assistant")
     print("=" * 50)
     print("Ask me anything about research at University of Birmingham!")
@@ -278,30 +632,31 @@ def interactive_research_assistant():
     while True:
         try:
             # Get user input
-            user_query = input("\n🔍 Your research question: ").strip()
-            
+            user_query = (await session.prompt_async("\n🔍 Your research question: ")).strip()
+
             # Check for exit commands
             if user_query.lower() in ['quit', 'exit', 'stop', '']:
                 print("\n👋 Thank you for using Birmingham Research Assistant!")
                 break
-            
-            # Process the query
-            print(f"\n🧠 Analyzing your query...")
-            response = smart_assistant.query(user_query)
-            
-            # Display response
+
+            # Process the query - the response streams as it generates
             print("\n📊 RESEARCH ANALYSIS RESULTS")
             print("=" * 60)
-            print(response)
+            await smart_assistant.aquery(user_query)
             print("=" * 60)
-            
+
+            # Refresh the Anthropic prompt-cache TTL while the user reads
+            # the answer and types the next question
+            smart_assistant._prewarm_task = asyncio.create_task(
+                smart_assistant._refresh_prompt_cache())
+
             # Ask if they want to continue
-            continue_choice = input("\n❓ Ask another question? (y/n): ").strip().lower()
+            continue_choice = (await session.prompt_async("\n❓ Ask another question? (y/n): ")).strip().lower()
             if continue_choice in ['n', 'no']:
                 print("\n👋 Thank you for using Birmingham Research Assistant!")
                 break
-                
-        except KeyboardInterrupt:
+
+        except (KeyboardInterrupt, EOFError):
             print("\n\n👋 Goodbye!")
             break
         except Exception as e:
@@ -310,15 +665,16 @@ def interactive_research_assistant():
 
 def quick_query():
     """Quick single query function"""
+    smart_assistant = get_assistant()
     if not smart_assistant:
         print("❌ Assistant not initialized.")
         return
     
     user_query = input("\n🔍 Enter your research question: ").strip()
     if user_query:
-        print(f"\n🧠 Processing: {user_query}")
-        response = smart_assistant.query(user_query)
-        print(f"\n📊 RESPONSE:\n{response}")
+        # The response streams to stdout while synthesis runs
+        print("\n📊 RESPONSE:")
+        smart_assistant.query(user_query)
     else:
         print("No query entered.")
 
@@ -326,29 +682,29 @@ def quick_query():
 # READY TO USE
 # ============================================================================
 
-if smart_assistant:
-    print("""
-    READY! Usage:
-    
-    response = smart_assistant.query("I want to design a deep learning model for early detection of lung cancer from CT scans")
-    print(response)
-    
-    Features:
-    ✅ LangGraph workflow orchestration
-    ✅ Claude-powered synthesis
-    ✅ Graph + Semantic hybrid search
-    ✅ Full research analysis pipeline
-    """)
-
 # Test function
 def test_assistant():
+    smart_assistant = get_assistant()
     if smart_assistant:
-        response = smart_assistant.query("machine learning healthcare Birmingham")
+        # The result streams to stdout while synthesis runs
         print("\nTEST RESULT:")
         print("=" * 40)
-        print(response)
-        return response
+        return smart_assistant.query("machine learning healthcare Birmingham")
     else:
         print("Assistant not initialized")
 
-print("\nRun test_assistant() to test the system")
\ No newline at end of file
+if __name__ == "__main__":
+    if get_assistant():
+        print("""
+    READY! Usage:
+
+    response = get_assistant().query("I want to design a deep learning model for early detection of lung cancer from CT scans")
+    print(response)
+
+    Features:
+    ✅ LangGraph workflow orchestration
+    ✅ Claude-powered synthesis
+    ✅ Graph + Semantic hybrid search
+    ✅ Full research analysis pipeline
+    """)
+    print("\nRun test_assistant() to test the system")
\ No newline at end of file
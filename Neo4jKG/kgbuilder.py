@@ -5,29 +5,61 @@ Robust processing with proper database handling
 """
 
 import os
+import sys
+import csv
 import json
 import time
 import logging
 from datetime import datetime
+import ijson
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    import pandas as pd
+except ImportError:
+    pd = None
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
 from tqdm import tqdm
-from collections import defaultdict
+from collections import Counter
+from itertools import combinations
+from concurrent.futures import ThreadPoolExecutor
 from neo4j import GraphDatabase
-from neo4j.exceptions import ServiceUnavailable, TransientError, NotALeader
 
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 class BirminghamKG:
-    def __init__(self, database="neo4j"):
+    def __init__(self, database="neo4j", connect=True):
         self.database = database
         self.driver = None
-        self.connect()
+        # CSV export for neo4j-admin runs against a stopped server, so
+        # connecting is optional
+        if connect:
+            self.connect()
         
         self.birmingham_institutions = [
             "University of Birmingham", "Birmingham Business School",
             "College of Social Sciences", "Birmingham Medical School"
         ]
+        # Lowercased once here instead of per paper x institution in the
+        # affiliation filter loop
+        self._birm_lower = tuple(inst.lower() for inst in self.birmingham_institutions)
+
+        # One automaton scan finds any institution name in a single pass
+        # over the affiliation string, however long the list grows; the
+        # any() path stays as the fallback without pyahocorasick
+        self._birm_ac = None
+        if ahocorasick is not None:
+            self._birm_ac = ahocorasick.Automaton()
+            for inst in self._birm_lower:
+                self._birm_ac.add_word(inst, inst)
+            self._birm_ac.make_automaton()
         
         self.stats = {'documents': 0, 'authors': 0, 'affiliations': 0, 'publications': 0}
         
@@ -36,9 +68,12 @@ class BirminghamKG:
         for attempt in range(3):
             try:
                 self.driver = GraphDatabase.driver(
-                    "neo4j://127.0.0.1:7687", 
+                    "neo4j://127.0.0.1:7687",
                     auth=("neo4j", "12345678"),
-                    max_connection_lifetime=300
+                    max_connection_lifetime=300,
+                    max_connection_pool_size=32,
+                    connection_acquisition_timeout=60,
+                    max_transaction_retry_time=30
                 )
                 
                 with self.driver.session(database=self.database) as session:
@@ -59,22 +94,94 @@ class BirminghamKG:
     def get_session(self):
         return self.driver.session(database=self.database)
     
-    def execute_query(self, query, params=None, session=None):
-        """Execute query with retry logic"""
-        for attempt in range(3):
+    def _apoc_available(self):
+        """Check once whether APOC is installed on the server"""
+        if not hasattr(self, '_has_apoc'):
             try:
-                if session:
-                    return session.run(query, params or {})
-                else:
-                    with self.get_session() as temp_session:
-                        return temp_session.run(query, params or {})
-            except (ServiceUnavailable, TransientError, NotALeader):
-                if attempt < 2:
-                    logger.warning(f"Retrying query (attempt {attempt + 2})")
-                    time.sleep(5)
-                else:
-                    raise
-    
+                with self.get_session() as session:
+                    session.run("RETURN apoc.version()").consume()
+                self._has_apoc = True
+            except Exception:
+                self._has_apoc = False
+        return self._has_apoc
+
+    def _write_batches_columnar(self, cypher, columns, batch_size=1000, max_workers=8):
+        """Write batches concurrently from columnar parameters - each
+        worker runs managed write transactions on a single long-lived
+        session (warm Bolt connection, warm plan cache), and the
+        parallel arrays mean PackStream doesn't repeat the field names
+        on every row like a list of maps would"""
+        names = list(columns)
+        total = len(columns[names[0]])
+        if not total:
+            return
+
+        slices = [{name: columns[name][i:i + batch_size] for name in names}
+                  for i in range(0, total, batch_size)]
+        workers = min(max_workers, len(slices))
+
+        def write_slice(worker_idx):
+            with self.get_session() as session:
+                for params in slices[worker_idx::workers]:
+                    session.execute_write(lambda tx, p=params: tx.run(cypher, p))
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(write_slice, idx) for idx in range(workers)]
+            for future in futures:
+                future.result()
+
+    def _write_relationships(self, match_action, columns, batch_size=1000):
+        """MERGE relationship rows given as a dict of parallel columns,
+        server-side via apoc.periodic.iterate when APOC is installed
+        (batches commit inside the server, no Bolt round trip per batch),
+        falling back to client-side columnar batches. The action refers
+        to the column names directly (e.g. author_id)"""
+        names = list(columns)
+        if not names or not len(columns[names[0]]):
+            return
+
+        select = ", ".join(f"${name}[i] AS {name}" for name in names)
+        if self._apoc_available():
+            driving = f"UNWIND range(0, size(${names[0]})-1) AS i RETURN {select}"
+            with self.get_session() as session:
+                session.run(
+                    "CALL apoc.periodic.iterate($driving, $action, "
+                    "{batchSize: $batchSize, parallel: false, params: $params})",
+                    {'driving': driving, 'action': match_action,
+                     'batchSize': batch_size, 'params': columns}
+                ).consume()
+        else:
+            cypher = (f"UNWIND range(0, size(${names[0]})-1) AS i\n"
+                      f"WITH {select}\n" + match_action)
+            self._write_batches_columnar(cypher, columns, batch_size=batch_size)
+
+    def _write_paper_batch(self, batch):
+        """Fused write for one batch of extracted paper rows: the
+        document and, via FOREACH, its publication, affiliations and
+        authors plus their relationships are created in a single
+        traversal, so the endpoints are never re-looked-up by separate
+        MATCH-MATCH-MERGE passes"""
+        with self.get_session() as session:
+            session.execute_write(lambda tx: tx.run("""
+                UNWIND $papers as p
+                MERGE (d:Document {document_id: p.document.document_id})
+                SET d.title = p.document.title, d.abstract = p.document.abstract,
+                    d.year = p.document.year, d.citation_count = p.document.citation_count,
+                    d.doi = p.document.doi, d.scopus_id = p.document.scopus_id
+                FOREACH (pub IN p.publication |
+                    MERGE (pb:Publication {publication_id: pub.publication_id})
+                    SET pb.name = pub.name, pb.issn = pub.issn, pb.publisher = pub.publisher
+                    MERGE (d)-[:PUBLISHED_IN]->(pb))
+                FOREACH (af IN p.affiliations |
+                    MERGE (afn:Affiliation {affiliation_id: af.affiliation_id})
+                    SET afn.name = af.name, afn.city = af.city, afn.country = af.country,
+                        afn.is_birmingham = af.is_birmingham)
+                FOREACH (a IN p.authors |
+                    MERGE (au:Author {author_id: a.author_id})
+                    SET au.full_name = a.full_name, au.orcid = a.orcid
+                    MERGE (au)-[:AUTHOR_OF]->(d))
+            """, {'papers': batch}))
+
     def clear_database(self):
         """Clear database safely"""
         logger.info("🗑️ Clearing database...")
@@ -91,18 +198,30 @@ class BirminghamKG:
                         except: pass
             except: pass
             
+            # Delete everything server-side in one statement (Neo4j 4.4+)
+            # - the sub-transactions commit on the server, with no Bolt
+            # round trip or re-plan per batch
+            try:
+                summary = session.run("""
+                    MATCH (n)
+                    CALL { WITH n DETACH DELETE n } IN TRANSACTIONS OF 10000 ROWS
+                """).consume()
+                logger.info(f"✅ Cleared {summary.counters.nodes_deleted:,} nodes")
+                return
+            except Exception as e:
+                logger.warning(f"IN TRANSACTIONS delete unavailable ({e}); falling back to batched delete")
+
             # Delete nodes in batches
             batch_size = 1000
             deleted_total = 0
-            
+
             while True:
                 try:
-                    result = self.execute_query(f"""
+                    record = session.execute_write(lambda tx: tx.run(f"""
                         MATCH (n) WITH n LIMIT {batch_size}
                         DETACH DELETE n RETURN COUNT(n) as deleted
-                    """, session=session)
-                    
-                    record = result.single()
+                    """).single())
+
                     if record and record['deleted'] > 0:
                         deleted_total += record['deleted']
                         logger.info(f"   Deleted {deleted_total:,} nodes")
@@ -125,15 +244,22 @@ class BirminghamKG:
             "CREATE CONSTRAINT document_id IF NOT EXISTS FOR (d:Document) REQUIRE d.document_id IS UNIQUE",
             "CREATE CONSTRAINT author_id IF NOT EXISTS FOR (a:Author) REQUIRE a.author_id IS UNIQUE",
             "CREATE CONSTRAINT publication_id IF NOT EXISTS FOR (p:Publication) REQUIRE p.publication_id IS UNIQUE",
-            "CREATE CONSTRAINT affiliation_id IF NOT EXISTS FOR (af:Affiliation) REQUIRE af.affiliation_id IS UNIQUE"
+            "CREATE CONSTRAINT affiliation_id IF NOT EXISTS FOR (af:Affiliation) REQUIRE af.affiliation_id IS UNIQUE",
+            "CREATE INDEX affil_birmingham IF NOT EXISTS FOR (af:Affiliation) ON (af.is_birmingham)"
         ]
         
         with self.get_session() as session:
             for constraint in constraints:
                 try:
-                    self.execute_query(constraint, session=session)
+                    session.run(constraint)
                 except: pass
-        
+
+            # Wait for the constraint-backed indexes to come online so
+            # the very first MERGE batches get indexed lookups
+            try:
+                session.run("CALL db.awaitIndexes(300)")
+            except: pass
+
         logger.info("✅ Schema created")
     
     def extract_papers(self, data):
@@ -164,7 +290,10 @@ class BirminghamKG:
         for affil in affil_list:
             if isinstance(affil, dict):
                 affil_name = affil.get('affilname', '').lower()
-                if any(inst.lower() in affil_name for inst in self.birmingham_institutions):
+                if self._birm_ac is not None:
+                    if next(self._birm_ac.iter(affil_name), None) is not None:
+                        return True
+                elif any(inst in affil_name for inst in self._birm_lower):
                     return True
         return False
     
@@ -173,9 +302,14 @@ class BirminghamKG:
         doi = paper.get('prism:doi', '')
         scopus_id = paper.get('dc:identifier', '').replace('SCOPUS_ID:', '')
         document_id = doi if doi else scopus_id
-        
+
         if not document_id:
             return None
+
+        # IDs repeat heavily across papers - interning shares one str
+        # object per unique id, shrinking the dedup sets and making
+        # their hash lookups identity-fast
+        document_id = sys.intern(str(document_id))
         
         # Extract year
         year = None
@@ -207,7 +341,8 @@ class BirminghamKG:
                     author_id = author.get('authid', author.get('@auid', ''))
                     if not author_id:
                         continue
-                    
+                    author_id = sys.intern(str(author_id))
+
                     full_name = author.get('authname', author.get('ce:indexed-name', ''))
                     
                     authors.append({
@@ -230,13 +365,16 @@ class BirminghamKG:
                 if isinstance(affil, dict):
                     affil_id = affil.get('afid', '')
                     name = affil.get('affilname', '')
-                    
+
                     if affil_id:
                         affiliations.append({
-                            'affiliation_id': affil_id,
+                            'affiliation_id': sys.intern(str(affil_id)),
                             'name': name,
                             'city': affil.get('affiliation-city', ''),
-                            'country': affil.get('affiliation-country', '')
+                            'country': affil.get('affiliation-country', ''),
+                            # Precomputed at ingest so insight queries hit an
+                            # indexed flag instead of scanning names
+                            'is_birmingham': any(inst in name.lower() for inst in self._birm_lower)
                         })
         
         return affiliations
@@ -257,242 +395,319 @@ class BirminghamKG:
             'publisher': paper.get('dc:publisher', '')
         }
     
+    def iter_papers(self, file_path):
+        """Stream paper entries from a JSON file without materializing it"""
+        # Try the streaming-friendly shapes first (binary mode for ijson)
+        for prefix in ('search-results.entry.item', 'entry.item'):
+            found = False
+            with open(file_path, 'rb') as f:
+                for paper in ijson.items(f, prefix, use_float=True):
+                    found = True
+                    yield paper
+            if found:
+                return
+
+        # Fall back to a full parse for the result_* shapes - orjson is
+        # several times faster than stdlib json when available
+        with open(file_path, 'rb') as f:
+            if orjson is not None:
+                data = orjson.loads(f.read())
+            else:
+                data = json.load(f)
+        for paper in self.extract_papers(data):
+            yield paper
+
     def load_data(self, json_files):
-        """Load data from JSON files"""
-        all_papers = []
-        
+        """Stream papers from JSON files one entry at a time"""
         if isinstance(json_files, str):
             json_files = [json_files]
-        
+
         for file_path in json_files:
             logger.info(f"📁 Loading {file_path}")
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                papers = self.extract_papers(data)
-                all_papers.extend(papers)
-        
-        logger.info(f"📊 Loaded {len(all_papers)} papers")
-        return all_papers
+            yield from self.iter_papers(file_path)
     
+    def _safe_extract(self, paper):
+        """Extract one paper's data, returning None on malformed input
+        instead of raising into the hot loop"""
+        try:
+            doc_data = self.extract_document_data(paper)
+            if not doc_data:
+                return None
+            return (doc_data,
+                    self.extract_authors_data(paper),
+                    self.extract_affiliations_data(paper),
+                    self.extract_publication_data(paper))
+        except Exception as e:
+            logger.debug(f"Skipping malformed paper: {e}")
+            return None
+
     def process_papers(self, raw_papers):
-        """Process papers into knowledge graph"""
+        """Process papers into knowledge graph (accepts any paper iterable)"""
         logger.info("🏛️ Processing Birmingham papers...")
-        
-        # Filter Birmingham papers
-        birmingham_papers = [paper for paper in raw_papers if self.is_birmingham_affiliated(paper)]
-        logger.info(f"🎯 Found {len(birmingham_papers)} Birmingham papers")
-        
-        if not birmingham_papers:
-            return 0
-        
-        # Pre-process data
+
+        # Filter and extract in a single pass - walking the paper dicts
+        # once instead of filtering into an intermediate list first
         logger.info("🔄 Pre-processing data...")
-        all_documents = []
-        all_authors = {}
-        all_affiliations = {}
-        all_publications = {}
-        all_relationships = {'author_of': [], 'affiliated_with': [], 'published_in': [], 'co_author': []}
-        
-        for paper in tqdm(birmingham_papers):
-            try:
-                doc_data = self.extract_document_data(paper)
-                if not doc_data:
-                    continue
-                
-                authors_data = self.extract_authors_data(paper)
-                affiliations_data = self.extract_affiliations_data(paper)
-                pub_data = self.extract_publication_data(paper)
-                
-                # Store data
-                all_documents.append(doc_data)
-                
-                for author in authors_data:
-                    all_authors[author['author_id']] = author
-                
-                for affil in affiliations_data:
-                    all_affiliations[affil['affiliation_id']] = affil
-                
-                if pub_data:
-                    all_publications[pub_data['publication_id']] = pub_data
-                
-                # Store relationships
-                doc_id = doc_data['document_id']
-                
-                for author in authors_data:
-                    all_relationships['author_of'].append({
-                        'author_id': author['author_id'],
-                        'doc_id': doc_id
-                    })
-                    
-                    for affil in affiliations_data:
-                        all_relationships['affiliated_with'].append({
-                            'author_id': author['author_id'],
-                            'affil_id': affil['affiliation_id']
-                        })
-                
-                if pub_data:
-                    all_relationships['published_in'].append({
-                        'doc_id': doc_id,
-                        'pub_id': pub_data['publication_id']
-                    })
-                
-                # Co-author relationships
-                if len(authors_data) > 1:
-                    for i, author1 in enumerate(authors_data):
-                        for author2 in authors_data[i+1:]:
-                            all_relationships['co_author'].append({
-                                'author1_id': author1['author_id'],
-                                'author2_id': author2['author_id'],
-                                'doc_id': doc_id
-                            })
-            
-            except Exception as e:
-                logger.error(f"Error processing paper: {e}")
+        birmingham_count = 0
+        paper_rows = []
+        author_ids = set()
+        affiliation_ids = set()
+        publication_ids = set()
+        # (author_id, affil_id) pairs - a set, because the same author
+        # carries the same affiliation on many papers and each duplicate
+        # MERGE locks both endpoint nodes
+        affiliated_with = set()
+        co_author_pairs = []
+        doc_count = 0
+
+        # Fused paper batches go out while extraction keeps running, so
+        # the Bolt writes overlap the JSON parsing instead of waiting
+        # for the whole pre-processing pass to finish
+        executor = ThreadPoolExecutor(max_workers=8)
+        write_futures = []
+
+        # Progress bar throttled to 1s updates, and off entirely when
+        # stdout isn't a terminal (CI / log files); no total since the
+        # papers may be streaming from ijson
+        for paper in tqdm(raw_papers, mininterval=1.0, disable=not sys.stdout.isatty()):
+            if not self.is_birmingham_affiliated(paper):
                 continue
-        
-        # Create nodes in batches
-        logger.info("🚀 Creating nodes in Neo4j...")
-        batch_size = 1000
-        
-        # Documents
-        logger.info("📄 Creating documents...")
-        for i in range(0, len(all_documents), batch_size):
-            batch = all_documents[i:i + batch_size]
-            with self.get_session() as session:
-                self.execute_query("""
-                    UNWIND $documents as doc
-                    MERGE (d:Document {document_id: doc.document_id})
-                    SET d.title = doc.title, d.abstract = doc.abstract,
-                        d.year = doc.year, d.citation_count = doc.citation_count,
-                        d.doi = doc.doi, d.scopus_id = doc.scopus_id
-                """, {'documents': batch}, session)
-        
-        # Authors
-        logger.info("👥 Creating authors...")
-        author_list = list(all_authors.values())
-        for i in range(0, len(author_list), batch_size):
-            batch = author_list[i:i + batch_size]
-            with self.get_session() as session:
-                self.execute_query("""
-                    UNWIND $authors as author
-                    MERGE (a:Author {author_id: author.author_id})
-                    SET a.full_name = author.full_name, a.orcid = author.orcid
-                """, {'authors': batch}, session)
-        
-        # Affiliations
-        logger.info("🏛️ Creating affiliations...")
-        affil_list = list(all_affiliations.values())
-        for i in range(0, len(affil_list), batch_size):
-            batch = affil_list[i:i + batch_size]
-            with self.get_session() as session:
-                self.execute_query("""
-                    UNWIND $affiliations as affil
-                    MERGE (af:Affiliation {affiliation_id: affil.affiliation_id})
-                    SET af.name = affil.name, af.city = affil.city, af.country = affil.country
-                """, {'affiliations': batch}, session)
-        
-        # Publications
-        if all_publications:
-            logger.info("📚 Creating publications...")
-            pub_list = list(all_publications.values())
-            for i in range(0, len(pub_list), batch_size):
-                batch = pub_list[i:i + batch_size]
-                with self.get_session() as session:
-                    self.execute_query("""
-                        UNWIND $publications as pub
-                        MERGE (p:Publication {publication_id: pub.publication_id})
-                        SET p.name = pub.name, p.issn = pub.issn, p.publisher = pub.publisher
-                    """, {'publications': batch}, session)
-        
-        # Create relationships
-        logger.info("🔗 Creating relationships...")
-        
-        # Author-Document relationships
-        for i in range(0, len(all_relationships['author_of']), batch_size):
-            batch = all_relationships['author_of'][i:i + batch_size]
-            with self.get_session() as session:
-                self.execute_query("""
-                    UNWIND $rels as rel
-                    MATCH (a:Author {author_id: rel.author_id})
-                    MATCH (d:Document {document_id: rel.doc_id})
-                    MERGE (a)-[:AUTHOR_OF]->(d)
-                """, {'rels': batch}, session)
-        
-        # Author-Affiliation relationships (deduplicated)
-        unique_affiliations = list({(rel['author_id'], rel['affil_id']): rel 
-                                   for rel in all_relationships['affiliated_with']}.values())
-        for i in range(0, len(unique_affiliations), batch_size):
-            batch = unique_affiliations[i:i + batch_size]
+            birmingham_count += 1
+
+            extracted = self._safe_extract(paper)
+            if extracted is None:
+                continue
+            doc_data, authors_data, affiliations_data, pub_data = extracted
+
+            # One row per paper carrying everything the fused Cypher
+            # statement needs (publication as a 0/1-element list so
+            # FOREACH can act as a conditional)
+            paper_rows.append({
+                'document': doc_data,
+                'publication': [pub_data] if pub_data else [],
+                'authors': authors_data,
+                'affiliations': affiliations_data
+            })
+
+            author_ids.update(a['author_id'] for a in authors_data)
+            affiliation_ids.update(af['affiliation_id'] for af in affiliations_data)
+            if pub_data:
+                publication_ids.add(pub_data['publication_id'])
+
+            affiliated_with.update((a['author_id'], af['affiliation_id'])
+                                   for a in authors_data for af in affiliations_data)
+
+            # Co-author pairs: sorting ids once per paper keeps the
+            # pair key canonical; aggregation happens after the loop
+            if len(authors_data) > 1:
+                sorted_ids = sorted(a['author_id'] for a in authors_data)
+                co_author_pairs.extend(combinations(sorted_ids, 2))
+
+            doc_count += 1
+            if len(paper_rows) >= 500:
+                write_futures.append(executor.submit(self._write_paper_batch, paper_rows))
+                paper_rows = []
+
+        logger.info(f"🎯 Found {birmingham_count} Birmingham papers")
+        if not doc_count:
+            executor.shutdown()
+            return 0
+
+        # Flush the tail batch and wait for the in-flight fused writes
+        logger.info("🚀 Finishing node and relationship writes...")
+        if paper_rows:
+            write_futures.append(executor.submit(self._write_paper_batch, paper_rows))
+        for future in write_futures:
+            future.result()
+        executor.shutdown()
+
+        # Refresh planner statistics after the node-heavy pass so the
+        # relationship MERGEs below cost their lookups against real
+        # cardinalities instead of falling back to label scans
+        try:
             with self.get_session() as session:
-                self.execute_query("""
-                    UNWIND $rels as rel
-                    MATCH (a:Author {author_id: rel.author_id})
-                    MATCH (af:Affiliation {affiliation_id: rel.affil_id})
-                    MERGE (a)-[:AFFILIATED_WITH]->(af)
-                """, {'rels': batch}, session)
-        
-        # Document-Publication relationships
-        if all_relationships['published_in']:
-            for i in range(0, len(all_relationships['published_in']), batch_size):
-                batch = all_relationships['published_in'][i:i + batch_size]
-                with self.get_session() as session:
-                    self.execute_query("""
-                        UNWIND $rels as rel
-                        MATCH (d:Document {document_id: rel.doc_id})
-                        MATCH (p:Publication {publication_id: rel.pub_id})
-                        MERGE (d)-[:PUBLISHED_IN]->(p)
-                    """, {'rels': batch}, session)
-        
-        # Co-author relationships (with counting)
+                session.run("CALL db.resampleOutdatedIndexes()")
+        except: pass
+
+        # Author-Affiliation relationships, deduplicated in-memory so
+        # each edge is MERGEd exactly once instead of once per paper
+        logger.info("🔗 Creating affiliation relationships...")
+        aff_authors, aff_affils = (map(list, zip(*affiliated_with))
+                                   if affiliated_with else ([], []))
+        self._write_relationships("""
+            MATCH (a:Author {author_id: author_id})
+            MATCH (af:Affiliation {affiliation_id: affil_id})
+            MERGE (a)-[:AFFILIATED_WITH]->(af)
+        """, {'author_id': aff_authors, 'affil_id': aff_affils})
+
+        # Co-author relationships - aggregate the pair counts. pandas
+        # runs the groupby in C, which pays off once the pair list is
+        # collaboration-heavy; the Counter path is fine below that
         logger.info("🤝 Creating co-author relationships...")
-        co_author_count = defaultdict(int)
-        for rel in all_relationships['co_author']:
-            key = tuple(sorted([rel['author1_id'], rel['author2_id']]))
-            co_author_count[key] += 1
-        
-        co_author_final = [{'author1_id': key[0], 'author2_id': key[1], 'count': count} 
-                          for key, count in co_author_count.items()]
-        
-        # Process in smaller batches for co-author relationships
-        small_batch = 500
-        for i in range(0, len(co_author_final), small_batch):
-            batch = co_author_final[i:i + small_batch]
-            with self.get_session() as session:
-                self.execute_query("""
-                    UNWIND $rels as rel
-                    MATCH (a1:Author {author_id: rel.author1_id})
-                    MATCH (a2:Author {author_id: rel.author2_id})
-                    MERGE (a1)-[co:CO_AUTHOR]-(a2)
-                    SET co.collaboration_count = rel.count
-                """, {'rels': batch}, session)
-            
-            if i % 5000 == 0:
-                logger.info(f"   Created {i:,} co-author relationships")
-                time.sleep(0.5)  # Brief pause
+        if pd is not None and len(co_author_pairs) >= 100000:
+            counts = pd.Series(1, index=pd.MultiIndex.from_tuples(co_author_pairs)) \
+                       .groupby(level=[0, 1]).sum()
+            co_author_items = counts.items()
+        else:
+            co_author_items = Counter(co_author_pairs).items()
+
+        ca_author1, ca_author2, ca_count = [], [], []
+        for (a1, a2), count in co_author_items:
+            ca_author1.append(a1)
+            ca_author2.append(a2)
+            ca_count.append(count)
+
+        # Smaller batches - co-author MERGEs lock two authors at a time
+        self._write_relationships("""
+            MATCH (a1:Author {author_id: author1_id})
+            MATCH (a2:Author {author_id: author2_id})
+            MERGE (a1)-[co:CO_AUTHOR]-(a2)
+            SET co.collaboration_count = collab_count
+        """, {'author1_id': ca_author1, 'author2_id': ca_author2, 'collab_count': ca_count},
+            batch_size=500)
+        logger.info(f"   Created {len(ca_author1):,} co-author relationships")
         
         # Update stats
-        self.stats['documents'] = len(all_documents)
-        self.stats['authors'] = len(all_authors)
-        self.stats['affiliations'] = len(all_affiliations)
-        self.stats['publications'] = len(all_publications)
-        
-        logger.info(f"✅ Created knowledge graph with {len(all_documents)} documents")
-        return len(all_documents)
+        self.stats['documents'] = doc_count
+        self.stats['authors'] = len(author_ids)
+        self.stats['affiliations'] = len(affiliation_ids)
+        self.stats['publications'] = len(publication_ids)
+
+        logger.info(f"✅ Created knowledge graph with {doc_count} documents")
+        return doc_count
     
+    def export_admin_import_csvs(self, raw_papers, out_dir="neo4j_import"):
+        """Write the graph as CSVs for 'neo4j-admin database import full'.
+
+        The offline importer writes store files directly, bypassing
+        transactions and Bolt entirely - by far the fastest cold-load
+        path. The target database must be stopped before running the
+        printed command; keep the Bolt path for incremental additions."""
+        os.makedirs(out_dir, exist_ok=True)
+        logger.info(f"📦 Exporting admin-import CSVs to {out_dir}/ ...")
+
+        seen_docs = set()
+        seen_authors = set()
+        seen_affils = set()
+        seen_pubs = set()
+        affiliated_with = set()
+        co_author_pairs = []
+        doc_count = 0
+
+        def clean(value):
+            # neo4j-admin rejects multiline fields by default, so fold
+            # newlines inside titles/abstracts into spaces
+            if isinstance(value, str) and ('\n' in value or '\r' in value):
+                return ' '.join(value.split())
+            return value
+
+        def open_csv(name, header):
+            f = open(os.path.join(out_dir, name), 'w', newline='', encoding='utf-8')
+            w = csv.writer(f)
+            w.writerow(header)
+            return f, w
+
+        doc_file, doc_w = open_csv('documents.csv',
+            ['document_id:ID(Document)', 'title', 'abstract', 'year:int',
+             'citation_count:int', 'doi', 'scopus_id'])
+        author_file, author_w = open_csv('authors.csv',
+            ['author_id:ID(Author)', 'full_name', 'orcid'])
+        affil_file, affil_w = open_csv('affiliations.csv',
+            ['affiliation_id:ID(Affiliation)', 'name', 'city', 'country', 'is_birmingham:boolean'])
+        pub_file, pub_w = open_csv('publications.csv',
+            ['publication_id:ID(Publication)', 'name', 'issn', 'publisher'])
+        author_of_file, author_of_w = open_csv('author_of.csv',
+            [':START_ID(Author)', ':END_ID(Document)'])
+        pub_in_file, pub_in_w = open_csv('published_in.csv',
+            [':START_ID(Document)', ':END_ID(Publication)'])
+
+        for paper in tqdm(raw_papers, mininterval=1.0, disable=not sys.stdout.isatty()):
+            if not self.is_birmingham_affiliated(paper):
+                continue
+            extracted = self._safe_extract(paper)
+            if extracted is None:
+                continue
+            doc_data, authors_data, affiliations_data, pub_data = extracted
+
+            # Merged Scopus dumps repeat papers across files/result
+            # blocks; the admin importer aborts on duplicate IDs, and a
+            # second occurrence would also re-emit its AUTHOR_OF /
+            # PUBLISHED_IN rows and inflate the co-author counts
+            if doc_data['document_id'] in seen_docs:
+                continue
+            seen_docs.add(doc_data['document_id'])
+
+            doc_w.writerow([doc_data['document_id'], clean(doc_data['title']),
+                            clean(doc_data['abstract']), doc_data['year'],
+                            doc_data['citation_count'], doc_data['doi'], doc_data['scopus_id']])
+            doc_count += 1
+
+            for author in authors_data:
+                if author['author_id'] not in seen_authors:
+                    seen_authors.add(author['author_id'])
+                    author_w.writerow([author['author_id'], clean(author['full_name']), author['orcid']])
+                author_of_w.writerow([author['author_id'], doc_data['document_id']])
+
+            for affil in affiliations_data:
+                if affil['affiliation_id'] not in seen_affils:
+                    seen_affils.add(affil['affiliation_id'])
+                    affil_w.writerow([affil['affiliation_id'], clean(affil['name']),
+                                      clean(affil['city']), clean(affil['country']),
+                                      str(affil['is_birmingham']).lower()])
+
+            if pub_data:
+                if pub_data['publication_id'] not in seen_pubs:
+                    seen_pubs.add(pub_data['publication_id'])
+                    pub_w.writerow([pub_data['publication_id'], clean(pub_data['name']),
+                                    pub_data['issn'], clean(pub_data['publisher'])])
+                pub_in_w.writerow([doc_data['document_id'], pub_data['publication_id']])
+
+            affiliated_with.update((a['author_id'], af['affiliation_id'])
+                                   for a in authors_data for af in affiliations_data)
+            if len(authors_data) > 1:
+                sorted_ids = sorted(a['author_id'] for a in authors_data)
+                co_author_pairs.extend(combinations(sorted_ids, 2))
+
+        aff_file, aff_w = open_csv('affiliated_with.csv',
+            [':START_ID(Author)', ':END_ID(Affiliation)'])
+        for author_id, affil_id in affiliated_with:
+            aff_w.writerow([author_id, affil_id])
+
+        co_file, co_w = open_csv('co_author.csv',
+            [':START_ID(Author)', ':END_ID(Author)', 'collaboration_count:int'])
+        for (a1, a2), count in Counter(co_author_pairs).items():
+            co_w.writerow([a1, a2, count])
+
+        for f in (doc_file, author_file, affil_file, pub_file,
+                  author_of_file, pub_in_file, aff_file, co_file):
+            f.close()
+
+        logger.info(f"✅ Exported {doc_count} documents, {len(seen_authors)} authors, "
+                    f"{len(seen_affils)} affiliations, {len(seen_pubs)} publications")
+        logger.info("💡 Stop the database, then run:")
+        logger.info(
+            f"   neo4j-admin database import full neo4j --overwrite-destination \\\n"
+            f"     --nodes=Document={out_dir}/documents.csv --nodes=Author={out_dir}/authors.csv \\\n"
+            f"     --nodes=Affiliation={out_dir}/affiliations.csv --nodes=Publication={out_dir}/publications.csv \\\n"
+            f"     --relationships=AUTHOR_OF={out_dir}/author_of.csv --relationships=PUBLISHED_IN={out_dir}/published_in.csv \\\n"
+            f"     --relationships=AFFILIATED_WITH={out_dir}/affiliated_with.csv --relationships=CO_AUTHOR={out_dir}/co_author.csv")
+        logger.info("   (restart the database and run create_schema() afterwards)")
+
+
     def get_statistics(self):
         """Get database statistics"""
         stats = {}
         with self.get_session() as session:
             for label in ['Document', 'Author', 'Publication', 'Affiliation']:
                 try:
-                    result = self.execute_query(f"MATCH (n:{label}) RETURN COUNT(n) as count", session=session)
-                    stats[f'{label.lower()}_nodes'] = result.single()['count']
+                    stats[f'{label.lower()}_nodes'] = session.execute_read(
+                        lambda tx, q=f"MATCH (n:{label}) RETURN COUNT(n) as count": tx.run(q).single()['count'])
                 except:
                     stats[f'{label.lower()}_nodes'] = 0
             
             try:
-                result = self.execute_query("MATCH (n) RETURN COUNT(n) as count", session=session)
-                stats['total_nodes'] = result.single()['count']
+                stats['total_nodes'] = session.execute_read(
+                    lambda tx: tx.run("MATCH (n) RETURN COUNT(n) as count").single()['count'])
             except:
                 stats['total_nodes'] = 0
         
@@ -501,40 +716,44 @@ class BirminghamKG:
     def show_insights(self):
         """Show Birmingham insights"""
         logger.info(f"\n🏛️ BIRMINGHAM INSIGHTS (Database: {self.database}):")
-        
-        with self.get_session() as session:
-            # Top authors
-            try:
-                result = self.execute_query("""
-                    MATCH (a:Author)-[:AFFILIATED_WITH]->(af:Affiliation)
-                    WHERE toLower(af.name) CONTAINS 'birmingham'
-                    OPTIONAL MATCH (a)-[:AUTHOR_OF]->(d:Document)
-                    RETURN a.full_name, COUNT(d) as papers, SUM(d.citation_count) as citations
-                    ORDER BY papers DESC LIMIT 10
-                """, session=session)
-                
-                logger.info("\n👥 TOP AUTHORS:")
-                for record in result:
-                    logger.info(f"   {record['a.full_name']} - {record['papers']} papers, {record['citations']} citations")
-            except Exception as e:
-                logger.warning(f"Error getting authors: {e}")
-            
-            # Research by year
-            try:
-                result = self.execute_query("""
-                    MATCH (a:Author)-[:AFFILIATED_WITH]->(af:Affiliation)
-                    WHERE toLower(af.name) CONTAINS 'birmingham'
-                    MATCH (a)-[:AUTHOR_OF]->(d:Document)
-                    WHERE d.year >= 2020
-                    RETURN d.year, COUNT(d) as papers
-                    ORDER BY d.year DESC
-                """, session=session)
-                
-                logger.info("\n📈 PAPERS BY YEAR:")
-                for record in result:
-                    logger.info(f"   {record['d.year']}: {record['papers']} papers")
-            except Exception as e:
-                logger.warning(f"Error getting yearly data: {e}")
+
+        # Both insight blocks run as one query in one round trip, keyed
+        # on the indexed is_birmingham flag instead of two
+        # toLower() CONTAINS scans over every affiliation name
+        query = """
+        CALL {
+            MATCH (a:Author)-[:AFFILIATED_WITH]->(af:Affiliation {is_birmingham: true})
+            OPTIONAL MATCH (a)-[:AUTHOR_OF]->(d:Document)
+            WITH a.full_name AS label, COUNT(d) AS papers, SUM(d.citation_count) AS citations
+            ORDER BY papers DESC LIMIT 10
+            RETURN 'top_author' AS kind, label, papers, citations
+          UNION ALL
+            MATCH (a:Author)-[:AFFILIATED_WITH]->(af:Affiliation {is_birmingham: true})
+            MATCH (a)-[:AUTHOR_OF]->(d:Document)
+            WHERE d.year >= 2020
+            WITH d.year AS year, COUNT(DISTINCT d) AS papers
+            RETURN 'by_year' AS kind, toString(year) AS label, papers, 0 AS citations
+        }
+        RETURN kind, label, papers, citations
+        """
+
+        try:
+            with self.get_session() as session:
+                records = session.execute_read(lambda tx: list(tx.run(query)))
+        except Exception as e:
+            logger.warning(f"Error getting insights: {e}")
+            return
+
+        logger.info("\n👥 TOP AUTHORS:")
+        for record in records:
+            if record['kind'] == 'top_author':
+                logger.info(f"   {record['label']} - {record['papers']} papers, {record['citations']} citations")
+
+        logger.info("\n📈 PAPERS BY YEAR:")
+        by_year = sorted((r for r in records if r['kind'] == 'by_year'),
+                         key=lambda r: r['label'], reverse=True)
+        for record in by_year:
+            logger.info(f"   {record['label']}: {record['papers']} papers")
     
     def close(self):
         if self.driver:
@@ -565,10 +784,17 @@ def main():
 1. Clear 'neo4j' database and process
 2. Add to existing 'neo4j' database
 3. Check database status first
+4. Export CSVs for offline neo4j-admin import (fastest cold load)
 
-Choose (1/2/3): """).strip()
+Choose (1/2/3/4): """).strip()
     
     try:
+        if choice == "4":
+            # Offline path: no driver needed, the server may be stopped
+            kg = BirminghamKG(connect=False)
+            kg.export_admin_import_csvs(kg.load_data(json_files))
+            return
+
         if choice == "3":
             # Check status first
             kg_system = BirminghamKG(database="system")
@@ -2,131 +2,361 @@
 # COLLABORATION NETWORK AND RESEARCH TREND ANALYSIS
 # ============================================================================
 
+import re
+import heapq
+import operator
 import networkx as nx
 import matplotlib.pyplot as plt
 from collections import defaultdict, Counter
+from functools import lru_cache
+from itertools import combinations
 import pandas as pd
 from datetime import datetime
 import numpy as np
-from scipy import stats
+from scipy import sparse, stats
 import seaborn as sns
+try:
+    import igraph
+except ImportError:
+    igraph = None
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+if njit is not None:
+    @njit(cache=True)
+    def _keyword_growth(counts, split):
+        """Sum the recent/earlier year windows per keyword (compiled)"""
+        n_kw, n_years = counts.shape
+        recent = np.zeros(n_kw, dtype=np.int64)
+        earlier = np.zeros(n_kw, dtype=np.int64)
+        for k in range(n_kw):
+            for y in range(n_years):
+                if y < split:
+                    earlier[k] += counts[k, y]
+                else:
+                    recent[k] += counts[k, y]
+        growth = (recent - earlier) / np.maximum(earlier, 1)
+        return recent, earlier, growth
+else:
+    def _keyword_growth(counts, split):
+        """Sum the recent/earlier year windows per keyword (vectorized)"""
+        recent = counts[:, split:].sum(axis=1)
+        earlier = counts[:, :split].sum(axis=1)
+        growth = (recent - earlier) / np.maximum(earlier, 1)
+        return recent, earlier, growth
+
+if njit is not None:
+    @njit(cache=True)
+    def _yearly_totals(years, citations, start_year, end_year):
+        """Per-year paper and citation totals over columnar arrays"""
+        span = end_year - start_year + 1
+        papers = np.zeros(span, dtype=np.int64)
+        cits = np.zeros(span, dtype=np.int64)
+        for i in range(years.shape[0]):
+            idx = years[i] - start_year
+            papers[idx] += 1
+            cits[idx] += citations[i]
+        return papers, cits
+else:
+    _yearly_totals = None
+
+BIRMINGHAM_AFFILIATIONS = [
+    'university of birmingham', 'birmingham business school',
+    'college of social sciences', 'birmingham medical school',
+    'university of birmingham dubai'
+]
+# One compiled alternation scan in C instead of five Python-level
+# substring checks per paper
+BHAM_RE = re.compile('|'.join(map(re.escape, BIRMINGHAM_AFFILIATIONS)))
+
+# Common research keywords to track in paper titles
+RESEARCH_KEYWORDS = [
+    'deep learning', 'machine learning', 'neural network', 'artificial intelligence',
+    'computer vision', 'natural language processing', 'reinforcement learning',
+    'transformer', 'attention', 'convolutional', 'lstm', 'gru',
+    'classification', 'segmentation', 'detection', 'prediction',
+    'medical imaging', 'healthcare', 'clinical', 'diagnosis',
+    'covid', 'cancer', 'tumor', 'disease',
+    'interpretable', 'explainable', 'federated', 'privacy',
+    'robust', 'adversarial', 'uncertainty', 'ensemble'
+]
+
+def _is_birmingham_paper(paper):
+    """Birmingham test with per-dict caching of the lowered affiliation
+    and the match result, so analyses sharing a paper list run the
+    regex once per paper instead of once per pass"""
+    is_bham = paper.get('_is_bham')
+    if is_bham is None:
+        aff_lower = paper.get('_aff_l')
+        if aff_lower is None:
+            aff_lower = paper['_aff_l'] = (paper.get('main_affiliation') or '').lower()
+        is_bham = paper['_is_bham'] = bool(BHAM_RE.search(aff_lower))
+    return is_bham
+
+# One compiled scan per title instead of ~32 Python substring checks.
+# No word-boundary anchors: matching is substring semantics, so
+# inflected forms ("transformers", "LSTMs", "attentional") still count
+# like they always have
+KW_RE = re.compile('|'.join(map(re.escape, RESEARCH_KEYWORDS)))
 
 class CollaborationTrendAnalyzer:
     def __init__(self, rag_system):
         self.rag = rag_system
-        
-    def analyze_collaboration_network(self, research_area, min_papers=2, top_k=50):
+        # Process-wide author-name interning table: the trend analysis
+        # tracks unique authors per year as small ints instead of
+        # accumulating sets of full-name strings
+        self._author_ids = {}
+
+    def _centrality_metrics(self, G):
+        """Compute the four centrality metrics, preferring the C-backed
+        igraph implementations (betweenness alone is O(V*E) in pure
+        Python) and falling back to NetworkX when igraph isn't installed"""
+        if len(G.nodes) == 0:
+            return {}
+
+        # Index-array view of the graph: the centralities below compute
+        # from these (and the CSR adjacency) rather than walking the
+        # nx.Graph's per-node dicts; the nx.Graph itself survives only
+        # as the returned artifact for display
+        nodes = list(G.nodes)
+        index = {name: i for i, name in enumerate(nodes)}
+        n = len(nodes)
+        edges = []
+        weights = []
+        for u, v, w in G.edges.data('weight', default=1):
+            edges.append((index[u], index[v]))
+            weights.append(w)
+
+        # Degree centrality straight from the CSR row pointers
+        deg_scale = 1 / (n - 1) if n > 1 else 1
+        if edges:
+            rows = np.fromiter((e[0] for e in edges), dtype=np.int64, count=len(edges))
+            cols = np.fromiter((e[1] for e in edges), dtype=np.int64, count=len(edges))
+            A = sparse.coo_matrix(
+                (np.ones(2 * len(edges)),
+                 (np.concatenate([rows, cols]), np.concatenate([cols, rows]))),
+                shape=(n, n)).tocsr()
+            deg_counts = np.diff(A.indptr)
+        else:
+            deg_counts = np.zeros(n, dtype=np.int64)
+        degree = {name: float(deg_counts[i]) * deg_scale for name, i in index.items()}
+
+        if igraph is not None:
+            g = igraph.Graph(n=n, edges=edges)
+            g.es['weight'] = weights
+
+            # No weights here: igraph treats them as distances, which
+            # would push shortest paths away from strong collaborations;
+            # the NetworkX fallback is unweighted for the same reason
+            betweenness = g.betweenness()
+            closeness = g.closeness()
+            try:
+                eigenvector = g.eigenvector_centrality(weights='weight')
+            except Exception:
+                eigenvector = [0.0] * n
+
+            # Normalize to match the NetworkX definitions. igraph's
+            # closeness is computed within each vertex's own component,
+            # so apply nx.closeness_centrality's Wasserman-Faust scaling
+            # of (component_size - 1)/(n - 1) - otherwise a researcher
+            # in an isolated 2-3 person clique scores ~1.0 and displaces
+            # giant-component hubs on these routinely disconnected
+            # graphs. NaN closeness (isolated vertices) becomes 0.
+            components = g.connected_components()
+            membership = components.membership
+            comp_sizes = components.sizes()
+            cls_scale = 1 / (n - 1) if n > 1 else 1
+            closeness = [
+                (closeness[i] if closeness[i] == closeness[i] else 0)
+                * (comp_sizes[membership[i]] - 1) * cls_scale
+                for i in range(n)
+            ]
+
+            bet_scale = 2 / ((n - 1) * (n - 2)) if n > 2 else 1
+            return {
+                'degree': degree,
+                'betweenness': {name: betweenness[i] * bet_scale for name, i in index.items()},
+                'closeness': {name: closeness[i] for name, i in index.items()},
+                'eigenvector': {name: eigenvector[i] for name, i in index.items()}
+            }
+
+        # Betweenness dominates the fallback path (O(V*E) in pure
+        # Python); sample source nodes on larger graphs so its cost stays
+        # bounded - the igraph path above handles the exact computation
+        k = min(256, len(G)) if len(G) > 256 else None
+
+        # ARPACK-backed eigenvector centrality on the giant component -
+        # the pure-Python power iteration often failed to converge on
+        # sparse collaboration graphs; nodes outside the giant get 0
+        eigenvector = {}
+        if len(G) == 1:
+            eigenvector = {node: 1.0 for node in G.nodes}
+        else:
+            giant = G.subgraph(max(nx.connected_components(G), key=len))
+            try:
+                eigenvector = {node: 0.0 for node in G.nodes}
+                eigenvector.update(nx.eigenvector_centrality_numpy(giant, weight='weight'))
+            except Exception:
+                eigenvector = {}
+
+        return {
+            'degree': degree,
+            'betweenness': nx.betweenness_centrality(G, k=k, seed=42),
+            'closeness': nx.closeness_centrality(G),
+            'eigenvector': eigenvector
+        }
+
+    def analyze_collaboration_network(self, research_area, min_papers=2, top_k=50, precomputed_embedding=None, papers=None):
         """Analyze collaboration networks for a research area"""
-        
+
         print(f"Analyzing collaboration network for: {research_area}")
         print("=" * 60)
-        
-        # Step 1: Get relevant papers
-        papers = self.rag.semantic_search_with_authors(research_area, top_k=top_k)
-        
-        # Step 2: Build collaboration graph
-        collaboration_graph = defaultdict(lambda: defaultdict(int))
-        author_paper_count = defaultdict(int)
+
+        # Step 1: Get relevant papers (callers running several analyses
+        # can pass a shared result set to skip the repeated search)
+        if papers is None:
+            papers = self.rag.semantic_search_with_authors(research_area, top_k=top_k,
+                                                           precomputed_embedding=precomputed_embedding)
+        
+        # Step 2: Count collaborations - one Counter entry per undirected
+        # pair instead of a nested dict storing every edge twice
+        edge_counts = Counter()
+        author_paper_count = Counter()
         author_info = {}
-        
-        birmingham_affiliations = [
-            'university of birmingham', 'birmingham business school',
-            'college of social sciences', 'birmingham medical school',
-            'university of birmingham dubai'
-        ]
+        # Intern author names to small ints so the O(k^2) pair loop and
+        # the count/edge maps hash ints instead of long name strings
+        name2id = {}
+        id2name = []
         
         for paper in papers:
+            # Affiliation test first - non-Birmingham papers (the common
+            # case) skip every other field fetch
+            if not _is_birmingham_paper(paper):
+                continue
+
             authors = paper.get('authors', [])
-            affiliation = paper.get('main_affiliation', '').lower()
             year = paper.get('year', 0)
-            
-            # Filter for Birmingham papers
-            is_birmingham = any(bham in affiliation for bham in birmingham_affiliations)
-            
-            if is_birmingham and len(authors) > 1:
-                # Count papers per author
+
+            if len(authors) > 1:
+                valid_ids = []
                 for author in authors:
-                    if author:
-                        author_paper_count[author] += 1
-                        if author not in author_info:
-                            author_info[author] = {
-                                'affiliation': paper.get('main_affiliation', ''),
-                                'years': [],
-                                'total_citations': 0
-                            }
-                        author_info[author]['years'].append(year)
-                        author_info[author]['total_citations'] += paper.get('citations', 0)
-                
-                # Build collaboration edges
-                for i, author1 in enumerate(authors):
-                    for author2 in authors[i+1:]:
-                        if author1 and author2:
-                            collaboration_graph[author1][author2] += 1
-                            collaboration_graph[author2][author1] += 1
-        
+                    if not author:
+                        continue
+                    author_id = name2id.get(author)
+                    if author_id is None:
+                        author_id = name2id[author] = len(id2name)
+                        id2name.append(author)
+                    valid_ids.append(author_id)
+
+                    if author not in author_info:
+                        author_info[author] = {
+                            'affiliation': paper.get('main_affiliation', ''),
+                            'years': [],
+                            'total_citations': 0
+                        }
+                    author_info[author]['years'].append(year)
+                    author_info[author]['total_citations'] += paper.get('citations', 0)
+
+                # Count papers per author
+                author_paper_count.update(valid_ids)
+
+                # Count each undirected pair once, in canonical order
+                edge_counts.update(tuple(sorted(pair))
+                                   for pair in combinations(valid_ids, 2))
+
         # Step 3: Filter authors with minimum papers
-        active_authors = {author for author, count in author_paper_count.items() 
+        active_authors = {author for author, count in author_paper_count.items()
                          if count >= min_papers}
-        
-        # Step 4: Create NetworkX graph
+
+        # Step 4: Create NetworkX graph in bulk, then swap the interned
+        # ids back to author names for display and downstream consumers
         G = nx.Graph()
-        
-        for author1 in active_authors:
-            G.add_node(author1, papers=author_paper_count[author1])
-            
-            for author2, weight in collaboration_graph[author1].items():
-                if author2 in active_authors and weight > 0:
-                    G.add_edge(author1, author2, weight=weight)
+        G.add_nodes_from((author, {'papers': author_paper_count[author]})
+                         for author in active_authors)
+        G.add_weighted_edges_from(
+            (author1, author2, weight) for (author1, author2), weight in edge_counts.items()
+            if author1 in active_authors and author2 in active_authors)
+        G = nx.relabel_nodes(G, {author_id: id2name[author_id] for author_id in G.nodes},
+                             copy=False)
+        author_paper_count = Counter({id2name[author_id]: count
+                                      for author_id, count in author_paper_count.items()})
         
         # Step 5: Calculate network metrics
         if len(G.nodes) > 0:
-            centrality_metrics = {
-                'degree': nx.degree_centrality(G),
-                'betweenness': nx.betweenness_centrality(G),
-                'closeness': nx.closeness_centrality(G),
-                'eigenvector': nx.eigenvector_centrality(G) if nx.is_connected(G) or len(G.nodes) == 1 else {}
-            }
-            
-            # Find communities
+            centrality_metrics = self._centrality_metrics(G)
+
+            # Find communities - Louvain is near-linear and reaches
+            # higher modularity than greedy CNM's O(E log^2 n); fall
+            # back to greedy on NetworkX versions without it
             try:
-                communities = list(nx.community.greedy_modularity_communities(G))
-            except:
-                communities = []
+                communities = list(nx.community.louvain_communities(G, weight='weight', seed=42))
+            except Exception:
+                try:
+                    communities = list(nx.community.greedy_modularity_communities(G))
+                except:
+                    communities = []
         else:
             centrality_metrics = {}
             communities = []
         
+        # Network-level stats computed once here - len(G.edges) is O(V)
+        # in NetworkX and nx.density would recount it, so display code
+        # and workflow consumers read these precomputed values instead
+        n_nodes = G.number_of_nodes()
+        n_edges = G.number_of_edges()
         return {
             'graph': G,
             'centrality_metrics': centrality_metrics,
             'communities': communities,
             'author_info': author_info,
-            'author_paper_count': author_paper_count
+            'author_paper_count': author_paper_count,
+            'n_nodes': n_nodes,
+            'n_edges': n_edges,
+            'density': 2 * n_edges / (n_nodes * (n_nodes - 1)) if n_nodes > 1 else 0,
+            'num_components': nx.number_connected_components(G) if n_nodes else 0
         }
     
+    @lru_cache(maxsize=128)
+    def _cached_collaboration_network(self, research_area, min_papers):
+        """Memoized analysis for repeat queries on the same research
+        area - the returned dict is shared between callers, so treat it
+        as read-only"""
+        return self.analyze_collaboration_network(research_area, min_papers)
+
+    @lru_cache(maxsize=128)
+    def _cached_research_trends(self, research_area, years_back):
+        """Memoized trend analysis (shared result - treat as read-only)"""
+        return self.analyze_research_trends(research_area, years_back)
+
+    def clear_caches(self):
+        """Drop memoized analyses, e.g. after rebuilding the RAG index"""
+        self._cached_collaboration_network.cache_clear()
+        self._cached_research_trends.cache_clear()
+
     def display_collaboration_network(self, network_data, research_area, top_n=10):
         """Display collaboration network analysis results"""
         
-        G = network_data['graph']
         centrality_metrics = network_data['centrality_metrics']
         communities = network_data['communities']
         author_info = network_data['author_info']
         
-        if len(G.nodes) == 0:
+        if network_data['n_nodes'] == 0:
             display(HTML("<h3>No collaboration network found for this research area</h3>"))
             return
-        
-        # Network Statistics
-        density = nx.density(G)
-        num_components = nx.number_connected_components(G)
-        
+
+        # Network Statistics (precomputed by the analysis)
+        density = network_data['density']
+        num_components = network_data['num_components']
+
         display(HTML(f"""
         <h3>Collaboration Network Analysis: {research_area}</h3>
         <div style="background-color: #f0f8ff; padding: 15px; border-radius: 5px; margin: 15px 0;">
             <h4>Network Statistics</h4>
             <ul>
-                <li><strong>Total Researchers:</strong> {len(G.nodes)}</li>
-                <li><strong>Collaboration Edges:</strong> {len(G.edges)}</li>
+                <li><strong>Total Researchers:</strong> {network_data['n_nodes']}</li>
+                <li><strong>Collaboration Edges:</strong> {network_data['n_edges']}</li>
                 <li><strong>Network Density:</strong> {density:.3f}</li>
                 <li><strong>Connected Components:</strong> {num_components}</li>
                 <li><strong>Research Communities:</strong> {len(communities)}</li>
@@ -139,8 +369,8 @@ class CollaborationTrendAnalyzer:
             metrics_html = ""
             for metric_name, metric_values in centrality_metrics.items():
                 if metric_values:
-                    top_researchers = sorted(metric_values.items(), 
-                                           key=lambda x: x[1], reverse=True)[:5]
+                    top_researchers = heapq.nlargest(5, metric_values.items(),
+                                                     key=operator.itemgetter(1))
                     
                     researchers_list = ""
                     for author, score in top_researchers:
@@ -182,17 +412,19 @@ class CollaborationTrendAnalyzer:
             </div>
             """))
     
-    def analyze_research_trends(self, research_area, years_back=10):
+    def analyze_research_trends(self, research_area, years_back=10, precomputed_embedding=None, papers=None):
         """Analyze research trends over time"""
-        
+
         print(f"Analyzing research trends for: {research_area}")
         print("=" * 60)
-        
+
         current_year = datetime.now().year
         start_year = current_year - years_back
-        
-        # Get papers with broader search
-        papers = self.rag.semantic_search_with_authors(research_area, top_k=100)
+
+        # Get papers with broader search (or reuse a shared result set)
+        if papers is None:
+            papers = self.rag.semantic_search_with_authors(research_area, top_k=100,
+                                                           precomputed_embedding=precomputed_embedding)
         
         # Analyze trends by year
         yearly_data = defaultdict(lambda: {
@@ -205,36 +437,57 @@ class CollaborationTrendAnalyzer:
         
         keyword_trends = defaultdict(lambda: defaultdict(int))
         
-        birmingham_affiliations = [
-            'university of birmingham', 'birmingham business school',
-            'college of social sciences', 'birmingham medical school',
-            'university of birmingham dubai'
-        ]
-        
+        row_years = []
+        row_citations = []
+
         for paper in papers:
+            # Affiliation test first, reusing the result cached by the
+            # collaboration pass when the paper list is shared
+            if not _is_birmingham_paper(paper):
+                continue
+
             year = paper.get('year')
-            affiliation = paper.get('main_affiliation', '').lower()
-            
-            # Filter for Birmingham and valid years
-            is_birmingham = any(bham in affiliation for bham in birmingham_affiliations)
-            
-            if is_birmingham and year and year >= start_year:
+            if year and year >= start_year:
                 citations = paper.get('citations', 0)
                 authors = paper.get('authors', [])
                 title = paper.get('title', '').lower()
-                
-                # Update yearly statistics
-                yearly_data[year]['papers'] += 1
-                yearly_data[year]['citations'] += citations
-                yearly_data[year]['authors'].update(authors)
-                
+
+                # Numeric columns go to the vectorized groupby below;
+                # authors and keywords stay in this pass since they feed
+                # per-year sets and the keyword trend matrix
+                row_years.append(year)
+                row_citations.append(citations)
+                yearly_data[year]['authors'].update(
+                    self._author_ids.setdefault(author, len(self._author_ids))
+                    for author in authors if author)
+
                 # Extract keywords from titles (simple approach)
                 keywords = self.extract_trend_keywords(title)
                 yearly_data[year]['keywords'].extend(keywords)
-                
+
                 # Track keyword trends over time
                 for keyword in keywords:
                     keyword_trends[keyword][year] += 1
+
+        # Aggregate paper and citation counts per year in one C-level
+        # pass - the numba kernel scans the columnar arrays directly,
+        # the pandas groupby covers environments without numba
+        if row_years:
+            if _yearly_totals is not None:
+                years_arr = np.asarray(row_years, dtype=np.int64)
+                cits_arr = np.asarray(row_citations, dtype=np.int64)
+                lo, hi = int(years_arr.min()), int(years_arr.max())
+                papers_per_year, cits_per_year = _yearly_totals(years_arr, cits_arr, lo, hi)
+                for offset in np.nonzero(papers_per_year)[0]:
+                    year = lo + int(offset)
+                    yearly_data[year]['papers'] = int(papers_per_year[offset])
+                    yearly_data[year]['citations'] = int(cits_per_year[offset])
+            else:
+                grouped = pd.DataFrame({'year': row_years, 'citations': row_citations}) \
+                            .groupby('year')['citations'].agg(['size', 'sum'])
+                for year, row in grouped.iterrows():
+                    yearly_data[year]['papers'] = int(row['size'])
+                    yearly_data[year]['citations'] = int(row['sum'])
         
         # Calculate averages and growth rates
         trend_analysis = {}
@@ -262,20 +515,29 @@ class CollaborationTrendAnalyzer:
                 'total_citations': sum(citations_by_year)
             }
         
-        # Find emerging keywords
+        # Find emerging keywords - flatten the per-keyword year counts
+        # into a matrix and reduce the recent/earlier windows in one
+        # compiled pass instead of per-keyword dict sums
         emerging_keywords = []
-        if len(years) >= 3:
-            recent_years = years[-3:]
-            earlier_years = years[:-3] if len(years) > 3 else []
-            
-            for keyword, year_counts in keyword_trends.items():
-                recent_count = sum(year_counts[y] for y in recent_years)
-                earlier_count = sum(year_counts[y] for y in earlier_years) if earlier_years else 1
-                
-                if recent_count >= 2 and recent_count > earlier_count:
-                    growth_rate = (recent_count - earlier_count) / max(earlier_count, 1)
-                    emerging_keywords.append((keyword, recent_count, growth_rate))
-        
+        if len(years) >= 3 and keyword_trends:
+            year_index = {y: i for i, y in enumerate(years)}
+            keywords = list(keyword_trends)
+            counts = np.zeros((len(keywords), len(years)), dtype=np.int32)
+            for k, keyword in enumerate(keywords):
+                for y, c in keyword_trends[keyword].items():
+                    if y in year_index:
+                        counts[k, year_index[y]] = c
+
+            recent, earlier, growth = _keyword_growth(counts, len(years) - 3)
+            if len(years) == 3:
+                # No earlier window - treat the baseline as 1, as before
+                earlier = np.ones_like(earlier)
+                growth = (recent - earlier) / np.maximum(earlier, 1)
+
+            for k, keyword in enumerate(keywords):
+                if recent[k] >= 2 and recent[k] > earlier[k]:
+                    emerging_keywords.append((keyword, int(recent[k]), float(growth[k])))
+
         emerging_keywords.sort(key=lambda x: x[2], reverse=True)
         
         return {
@@ -287,27 +549,7 @@ class CollaborationTrendAnalyzer:
     
     def extract_trend_keywords(self, title):
         """Extract meaningful keywords from paper titles"""
-        
-        # Common research keywords to track
-        research_keywords = [
-            'deep learning', 'machine learning', 'neural network', 'artificial intelligence',
-            'computer vision', 'natural language processing', 'reinforcement learning',
-            'transformer', 'attention', 'convolutional', 'lstm', 'gru',
-            'classification', 'segmentation', 'detection', 'prediction',
-            'medical imaging', 'healthcare', 'clinical', 'diagnosis',
-            'covid', 'cancer', 'tumor', 'disease',
-            'interpretable', 'explainable', 'federated', 'privacy',
-            'robust', 'adversarial', 'uncertainty', 'ensemble'
-        ]
-        
-        found_keywords = []
-        title_lower = title.lower()
-        
-        for keyword in research_keywords:
-            if keyword in title_lower:
-                found_keywords.append(keyword)
-        
-        return found_keywords
+        return list(dict.fromkeys(KW_RE.findall(title.lower())))
     
     def display_research_trends(self, trends_data, research_area):
         """Display research trends analysis"""
@@ -342,7 +584,7 @@ class CollaborationTrendAnalyzer:
         
         # Year by year breakdown
         years_html = ""
-        for year in sorted(yearly_data.keys(), reverse=True)[:5]:
+        for year in heapq.nlargest(5, yearly_data.keys()):
             data = yearly_data[year]
             avg_cit = data['citations'] / max(data['papers'], 1)
             unique_authors = len(data['authors'])
@@ -384,14 +626,23 @@ class CollaborationTrendAnalyzer:
         <hr style="margin: 20px 0;">
         """))
         
+        # One retrieval serves both analyses - they only differed on
+        # top_k (50 vs 100), so fetch the larger set once and slice.
+        # Annotating the Birmingham matches up front means neither
+        # analysis re-runs the affiliation regex
+        papers = self.rag.semantic_search_with_authors(research_area, top_k=100)
+        for paper in papers:
+            _is_birmingham_paper(paper)
+
         # Collaboration Network Analysis
-        network_data = self.analyze_collaboration_network(research_area, min_papers)
+        network_data = self.analyze_collaboration_network(research_area, min_papers,
+                                                          papers=papers[:50])
         self.display_collaboration_network(network_data, research_area)
-        
+
         print("\n" + "="*60 + "\n")
-        
+
         # Research Trends Analysis
-        trends_data = self.analyze_research_trends(research_area)
+        trends_data = self.analyze_research_trends(research_area, papers=papers)
         self.display_research_trends(trends_data, research_area)
         
         return {
@@ -417,14 +668,14 @@ def analyze_research_landscape(research_area, min_papers=2):
     return collab_trend_analyzer.comprehensive_research_analysis(research_area, min_papers)
 
 def analyze_collaborations_only(research_area, min_papers=2):
-    """Analyze just the collaboration network"""
-    network_data = collab_trend_analyzer.analyze_collaboration_network(research_area, min_papers)
+    """Analyze just the collaboration network (cached per area)"""
+    network_data = collab_trend_analyzer._cached_collaboration_network(research_area, min_papers)
     collab_trend_analyzer.display_collaboration_network(network_data, research_area)
     return network_data
 
 def analyze_trends_only(research_area, years_back=10):
-    """Analyze just the research trends"""
-    trends_data = collab_trend_analyzer.analyze_research_trends(research_area, years_back)
+    """Analyze just the research trends (cached per area)"""
+    trends_data = collab_trend_analyzer._cached_research_trends(research_area, years_back)
     collab_trend_analyzer.display_research_trends(trends_data, research_area)
     return trends_data
 
@@ -69,14 +69,16 @@ class AdvancedResearchAssistant:
             'original_query': query
         }
     
-    def find_birmingham_researchers(self, research_area, top_k=10):
+    def find_birmingham_researchers(self, research_area, top_k=10, precomputed_embedding=None, papers=None):
         """Find Birmingham researchers specializing in a research area"""
-        
+
         print(f"Finding Birmingham researchers for: {research_area}")
         print("=" * 60)
-        
-        # Step 1: Find relevant papers
-        papers = self.rag.semantic_search_with_authors(research_area, top_k=50)
+
+        # Step 1: Find relevant papers (or reuse a shared result set)
+        if papers is None:
+            papers = self.rag.semantic_search_with_authors(research_area, top_k=50,
+                                                           precomputed_embedding=precomputed_embedding)
         
         # Step 2: Extract Birmingham authors and their metrics
         author_metrics = defaultdict(lambda: {
@@ -198,15 +198,19 @@ class FixedAcademicRAGSystem:
         cs_test = [doc for doc in documents if any(term in doc.lower() for term in ['machine learning', 'computer', 'algorithm', 'artificial intelligence'])]
         print(f"CS-related papers in index: {len(cs_test):,}")
     
-    def semantic_search_with_authors(self, query: str, top_k: int = 10):
+    def semantic_search_with_authors(self, query: str, top_k: int = 10, precomputed_embedding=None):
         """FIXED: Semantic search that includes author information"""
         if self.faiss_index is None:
             print("FAISS index not built! Run build_document_embeddings_fixed() first")
             return []
-        
-        # Encode query
-        query_embedding = self.embedding_model.encode([query])
-        faiss.normalize_L2(query_embedding)
+
+        # Encode query (callers that already embedded it can pass the
+        # normalized vector to skip re-encoding)
+        if precomputed_embedding is not None:
+            query_embedding = np.asarray(precomputed_embedding, dtype=np.float32).reshape(1, -1)
+        else:
+            query_embedding = self.embedding_model.encode([query])
+            faiss.normalize_L2(query_embedding)
         
         # Search
         scores, indices = self.faiss_index.search(query_embedding.astype(np.float32), top_k)